@@ -60,6 +60,9 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Reuse connections across requests in long-running processes (e.g. Gunicorn)
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
@@ -93,4 +96,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # License settings
 LICENSE_KEY_LENGTH = 32  # Length of the license key
-LICENSE_SECRET = 'YOUR_SECRET_HERE'  # Change this in production
\ No newline at end of file
+LICENSE_SECRET = 'YOUR_SECRET_HERE'  # Change this in production
+LICENSE_CHECK_BATCH_SIZE = 500  # Buffered license checks written per INSERT batch
+LICENSE_CHECK_FLUSH_INTERVAL = 5  # Seconds between flushes of buffered license checks
+LICENSE_CHECK_DEDUP_SECONDS = 5  # Window for collapsing identical validation checks (0 disables)
\ No newline at end of file
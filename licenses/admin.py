@@ -1,15 +1,32 @@
 # File: licenses/admin.py
 from django.contrib import admin
+from django.forms.models import BaseInlineFormSet
 from .models import LicenseType, License, LicenseCheck
 
 
+class RecentLicenseCheckFormSet(BaseInlineFormSet):
+    """Inline formset that only loads the most recent license checks"""
+    max_checks = 100
+
+    def get_queryset(self):
+        if not hasattr(self, '_recent_queryset'):
+            self._recent_queryset = super().get_queryset().order_by('-timestamp')[:self.max_checks]
+        return self._recent_queryset
+
+
 class LicenseCheckInline(admin.TabularInline):
     model = LicenseCheck
+    formset = RecentLicenseCheckFormSet
     extra = 0
-    readonly_fields = ['timestamp', 'status', 'ip_address', 'hardware_id', 'user_agent', 'message']
+    fields = ['timestamp', 'status', 'ip_address', 'hardware_id', 'message']
+    readonly_fields = fields
     can_delete = False
     max_num = 0
     ordering = ['-timestamp']
+    
+    def get_queryset(self, request):
+        """Skip user_agent, which is only shown on the LicenseCheck admin"""
+        return super().get_queryset(request).only('license', *self.fields)
 
 
 @admin.register(LicenseType)
@@ -22,6 +39,7 @@ class LicenseTypeAdmin(admin.ModelAdmin):
 @admin.register(License)
 class LicenseAdmin(admin.ModelAdmin):
     list_display = ['key_short', 'user', 'license_type', 'status', 'created_at', 'expires_at']
+    list_select_related = ['user', 'license_type']
     list_filter = ['status', 'license_type', 'created_at']
     search_fields = ['key', 'user__username', 'notes']
     readonly_fields = ['created_at', 'updated_at', 'last_checked']
@@ -37,36 +55,21 @@ class LicenseAdmin(admin.ModelAdmin):
     
     def activate_licenses(self, request, queryset):
         """Admin action to activate selected licenses"""
-        activated = 0
-        for license in queryset:
-            if license.status != 'active' and license.status != 'revoked':
-                license.activate()
-                activated += 1
-        
+        activated = queryset.bulk_activate()
         self.message_user(request, f"{activated} licenses activated successfully")
     
     activate_licenses.short_description = "Activate selected licenses"
     
     def deactivate_licenses(self, request, queryset):
         """Admin action to deactivate selected licenses"""
-        deactivated = 0
-        for license in queryset:
-            if license.status == 'active':
-                license.deactivate()
-                deactivated += 1
-        
+        deactivated = queryset.bulk_deactivate()
         self.message_user(request, f"{deactivated} licenses deactivated successfully")
     
     deactivate_licenses.short_description = "Deactivate selected licenses"
     
     def revoke_licenses(self, request, queryset):
         """Admin action to revoke selected licenses"""
-        revoked = 0
-        for license in queryset:
-            if license.status != 'revoked':
-                license.revoke()
-                revoked += 1
-        
+        revoked = queryset.bulk_revoke()
         self.message_user(request, f"{revoked} licenses revoked successfully")
     
     revoke_licenses.short_description = "Revoke selected licenses (permanent)"
@@ -75,6 +78,7 @@ class LicenseAdmin(admin.ModelAdmin):
 @admin.register(LicenseCheck)
 class LicenseCheckAdmin(admin.ModelAdmin):
     list_display = ['license_key', 'status', 'timestamp', 'ip_address', 'hardware_id']
+    list_select_related = ['license']
     list_filter = ['status', 'timestamp']
     search_fields = ['license__key', 'ip_address', 'hardware_id', 'message']
     readonly_fields = ['license', 'timestamp', 'status', 'ip_address', 'hardware_id', 'user_agent', 'message']
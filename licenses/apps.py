@@ -0,0 +1,10 @@
+# File: licenses/apps.py
+from django.apps import AppConfig
+
+
+class LicensesConfig(AppConfig):
+    name = 'licenses'
+
+    def ready(self):
+        # Connect the LicenseType signal receivers defined in services
+        from . import services  # noqa: F401
@@ -0,0 +1,27 @@
+# File: licenses/management/_rich.py
+from rich.console import Console
+from rich.table import Table
+
+
+# Shared console so terminal detection only happens once per process
+CONSOLE = Console()
+
+
+def details_table(title, label="Field"):
+    """Build a two-column table for showing the attributes of one license"""
+    table = Table(title=title)
+    table.add_column(label, style="cyan")
+    table.add_column("Value")
+    return table
+
+
+def license_table(title=None):
+    """Build the table used for listing licenses"""
+    table = Table(title=title, show_header=True)
+    table.add_column("License Key", style="cyan")
+    table.add_column("Status")
+    table.add_column("Type")
+    table.add_column("User")
+    table.add_column("Created", style="dim")
+    table.add_column("Expires")
+    return table
@@ -1,8 +1,8 @@
 # File: licenses/management/commands/activate_key.py
 from django.core.management.base import BaseCommand, CommandError
-from rich.console import Console
 from licenses.services import LicenseService
 from licenses.utils import generate_hardware_id
+from licenses.management._rich import CONSOLE
 
 
 class Command(BaseCommand):
@@ -18,17 +18,24 @@ class Command(BaseCommand):
             '--hardware-id',
             help='Hardware ID to associate with this license (defaults to current system)'
         )
+        
+        parser.add_argument(
+            '--refresh-hardware-id',
+            action='store_true',
+            help='Probe the system again instead of using the cached hardware ID'
+        )
 
     def handle(self, *args, **options):
-        console = Console()
+        console = CONSOLE
         
         try:
             key = options['key']
             hardware_id = options.get('hardware_id')
+            refresh_hardware_id = options.get('refresh_hardware_id', False)
             
             # If no hardware ID provided, generate one from current system
             if not hardware_id:
-                hardware_id = generate_hardware_id()
+                hardware_id = generate_hardware_id(refresh=refresh_hardware_id)
                 console.print(f"[dim]Using hardware ID: {hardware_id[:8]}...[/dim]")
             
             # Activate the license
@@ -41,7 +48,7 @@ class Command(BaseCommand):
                 console.print(f"License: [bold cyan]{license_data['key']}[/bold cyan]")
                 console.print(f"Status: [green]{license_data['status']}[/green]")
                 console.print(f"Type: {license_data['license_type']}")
-                console.print(f"Expires: {license_data['expires_at'].strftime('%Y-%m-%d %H:%M:%S')}")
+                console.print(f"Expires: {license_data['expires_at'].isoformat(' ', 'seconds')[:19]}")
             else:
                 console.print(f"[bold red]Error:[/bold red] {result['message']}")
                 
@@ -1,12 +1,12 @@
 # File: licenses/management/commands/check_key.py
 from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
-from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
-from licenses.models import License, LicenseCheck
+from licenses.models import flush_license_checks
 from licenses.services import LicenseService
 from licenses.utils import generate_hardware_id
+from licenses.management._rich import CONSOLE, details_table
 
 
 class Command(BaseCommand):
@@ -23,6 +23,12 @@ class Command(BaseCommand):
             help='Hardware ID for validation (defaults to current system)'
         )
         
+        parser.add_argument(
+            '--refresh-hardware-id',
+            action='store_true',
+            help='Probe the system again instead of using the cached hardware ID'
+        )
+        
         parser.add_argument(
             '--activity',
             action='store_true',
@@ -30,16 +36,17 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
-        console = Console()
+        console = CONSOLE
         
         try:
             key = options['key']
             hardware_id = options.get('hardware_id')
+            refresh_hardware_id = options.get('refresh_hardware_id', False)
             show_activity = options.get('activity', False)
             
             # If no hardware ID provided, generate one from current system
             if not hardware_id:
-                hardware_id = generate_hardware_id()
+                hardware_id = generate_hardware_id(refresh=refresh_hardware_id)
                 console.print(f"[dim]Using hardware ID: {hardware_id[:8]}...[/dim]")
             
             # Validate the license
@@ -51,15 +58,26 @@ class Command(BaseCommand):
                     expand=False
                 ))
                 
-                # Get detailed info
-                info = LicenseService.get_license_info(key)
+                # Get detailed info, along with recent activity if requested
+                info = None
+                if show_activity:
+                    try:
+                        # Write buffered checks, including this validation, before reading them
+                        flush_license_checks()
+                        info = LicenseService.get_license_with_history(key)
+                        if not info['success']:
+                            raise Exception(info['message'])
+                    except Exception as e:
+                        console.print(f"[bold yellow]Warning:[/bold yellow] Could not retrieve activity: {str(e)}")
+                        info = None
+                
+                if info is None:
+                    info = LicenseService.get_license_info(key)
                 
                 if info['success']:
                     license_data = info['license_data']
                     
-                    table = Table(title="License Details")
-                    table.add_column("Attribute", style="cyan")
-                    table.add_column("Value")
+                    table = details_table("License Details", label="Attribute")
                     
                     table.add_row("Key", license_data['key'])
                     table.add_row("Status", f"[green]{license_data['status']}[/green]" if license_data['status'] == 'active' else license_data['status'])
@@ -72,30 +90,24 @@ class Command(BaseCommand):
                     
                     console.print(table)
                     
-                    # Show activity if requested
-                    if show_activity:
-                        try:
-                            license_obj = License.objects.get(key=key)
-                            checks = LicenseCheck.objects.filter(license=license_obj).order_by('-timestamp')[:20]
-                            
-                            activity_table = Table(title="License Activity (Last 20 Events)")
-                            activity_table.add_column("Timestamp", style="dim")
-                            activity_table.add_column("Status")
-                            activity_table.add_column("Message")
-                            activity_table.add_column("Hardware ID", style="dim")
+                    # Show activity if requested and it could be retrieved
+                    if 'recent_checks' in license_data:
+                        activity_table = Table(title="License Activity (Last 20 Events)")
+                        activity_table.add_column("Timestamp", style="dim")
+                        activity_table.add_column("Status")
+                        activity_table.add_column("Message")
+                        activity_table.add_column("Hardware ID", style="dim")
+                        
+                        for check in license_data['recent_checks']:
+                            status_style = "green" if check['status'].startswith("check_success") or check['status'] == "activated" else "red"
+                            activity_table.add_row(
+                                check['timestamp'].isoformat(' ', 'seconds')[:19],
+                                f"[{status_style}]{check['status']}[/{status_style}]",
+                                check['message'] or "",
+                                check['hardware_id'][:8] + "..." if check['hardware_id'] else ""
+                            )
                             
-                            for check in checks:
-                                status_style = "green" if check.status.startswith("check_success") or check.status == "activated" else "red"
-                                activity_table.add_row(
-                                    check.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                                    f"[{status_style}]{check.status}[/{status_style}]",
-                                    check.message or "",
-                                    check.hardware_id[:8] + "..." if check.hardware_id else ""
-                                )
-                                
-                            console.print(activity_table)
-                        except Exception as e:
-                            console.print(f"[bold yellow]Warning:[/bold yellow] Could not retrieve activity: {str(e)}")
+                        console.print(activity_table)
             else:
                 console.print(Panel(
                     f"License key [bold]{key}[/bold] is [bold red]INVALID[/bold red]\n\n{result['message']}",
@@ -0,0 +1,18 @@
+# File: licenses/management/commands/expire_keys.py
+from django.core.management.base import BaseCommand, CommandError
+from licenses.services import LicenseService
+from licenses.management._rich import CONSOLE
+
+
+class Command(BaseCommand):
+    help = 'Mark all licenses past their expiration date as expired'
+
+    def handle(self, *args, **options):
+        console = CONSOLE
+        
+        try:
+            expired = LicenseService.sweep_expired()
+            console.print(f"[bold green]Success![/bold green] {expired} licenses marked as expired.")
+                
+        except Exception as e:
+            raise CommandError(f"Error expiring licenses: {str(e)}")
@@ -1,11 +1,12 @@
 # File: licenses/management/commands/generate_key.py
 from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.models import User
+from django.db import transaction
 from django.utils import timezone
-from rich.console import Console
 from rich.table import Table
 from licenses.models import LicenseType, License
 from licenses.services import LicenseService
+from licenses.management._rich import CONSOLE, details_table
 
 
 class Command(BaseCommand):
@@ -49,7 +50,7 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
-        console = Console()
+        console = CONSOLE
         
         try:
             license_type_id = options['license_type_id']
@@ -94,32 +95,29 @@ class Command(BaseCommand):
                     console.print(f"[bold yellow]Warning:[/bold yellow] User '{username}' not found. License will be created without a user.")
             
             # Generate the licenses
-            licenses = []
-            for i in range(count):
-                license = LicenseService.create_license(
-                    license_type_id=license_type_id,
+            with transaction.atomic():
+                licenses = LicenseService.bulk_create_licenses(
+                    count,
+                    license_type=license_type,
                     user=user,
                     prefix=prefix,
                     max_activations=max_activations,
                     notes=notes
                 )
-                licenses.append(license)
             
             # Display results
             if count == 1:
                 console.print(f"[bold green]Success![/bold green] License generated.")
                 
                 # Display license details
-                table = Table(title="License Details")
-                table.add_column("Field", style="cyan")
-                table.add_column("Value")
+                table = details_table("License Details")
                 
                 table.add_row("License Key", licenses[0].key)
                 table.add_row("License Type", license_type.name)
                 table.add_row("Status", licenses[0].status)
                 table.add_row("User", username if username else "None")
-                table.add_row("Created", licenses[0].created_at.strftime('%Y-%m-%d %H:%M:%S'))
-                table.add_row("Expires", licenses[0].expires_at.strftime('%Y-%m-%d %H:%M:%S') if licenses[0].expires_at else "Not set")
+                table.add_row("Created", licenses[0].created_at.isoformat(' ', 'seconds')[:19])
+                table.add_row("Expires", licenses[0].expires_at.isoformat(' ', 'seconds')[:19] if licenses[0].expires_at else "Not set")
                 
                 console.print(table)
             else:
@@ -136,8 +134,8 @@ class Command(BaseCommand):
                     table.add_row(
                         license.key,
                         license.status,
-                        license.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                        license.expires_at.strftime('%Y-%m-%d %H:%M:%S') if license.expires_at else "Not set"
+                        license.created_at.isoformat(' ', 'seconds')[:19],
+                        license.expires_at.isoformat(' ', 'seconds')[:19] if license.expires_at else "Not set"
                     )
                 
                 console.print(table)
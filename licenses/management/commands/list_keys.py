@@ -1,11 +1,17 @@
 # File: licenses/management/commands/list_keys.py
 from django.core.management.base import BaseCommand, CommandError
-from django.db.models import Q
+from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import timedelta
-from rich.console import Console
-from rich.table import Table
 from licenses.models import License, LicenseType
+from licenses.management._rich import CONSOLE, license_table
+
+
+STATUS_COLOR = {
+    'active': 'green',
+    'expired': 'yellow',
+    'revoked': 'red',
+}
 
 
 class Command(BaseCommand):
@@ -46,9 +52,15 @@ class Command(BaseCommand):
             default=50,
             help='Limit number of results (default: 50)'
         )
+        
+        parser.add_argument(
+            '--exists',
+            action='store_true',
+            help='Only report whether any license matches the filters'
+        )
 
     def handle(self, *args, **options):
-        console = Console()
+        console = CONSOLE
         
         try:
             status = options.get('status')
@@ -57,6 +69,7 @@ class Command(BaseCommand):
             expiring_days = options.get('expiring')
             search = options.get('search')
             limit = options.get('limit', 50)
+            exists_only = options.get('exists', False)
             
             # Build query filters
             filters = Q()
@@ -77,30 +90,40 @@ class Command(BaseCommand):
             if search:
                 filters &= Q(key__icontains=search) | Q(notes__icontains=search)
             
-            # Get licenses
-            licenses = License.objects.filter(filters).select_related('license_type', 'user').order_by('-created_at')[:limit]
+            if exists_only:
+                found = License.objects.filter(filters).exists()
+                console.print("[green]yes[/green]" if found else "[yellow]no[/yellow]")
+                return
+            
+            # Summarize licenses by status when listing without filters
+            if not any([status, license_type, username, expiring_days, search]):
+                summary = dict(License.objects.values_list('status').annotate(n=Count('id')).order_by())
+                parts = []
+                for license_status, n in sorted(summary.items()):
+                    color = STATUS_COLOR.get(license_status)
+                    parts.append(f"[{color}]{license_status}[/{color}]: {n}" if color else f"{license_status}: {n}")
+                if parts:
+                    console.print("Summary: " + ", ".join(parts))
             
-            # Count total matches
-            total_count = License.objects.filter(filters).count()
+            # Get licenses
+            queryset = License.objects.filter(filters).select_related('license_type', 'user').only(
+                'key', 'status', 'created_at', 'expires_at', 'license_type__name', 'user__username'
+            ).order_by('-created_at')
             
             # Display results
-            table = Table(show_header=True)
-            table.add_column("License Key", style="cyan")
-            table.add_column("Status")
-            table.add_column("Type")
-            table.add_column("User")
-            table.add_column("Created", style="dim")
-            table.add_column("Expires")
+            table = license_table()
             
-            for license in licenses:
+            # Stream rows into the table; one row past the limit means there are more matches
+            shown = 0
+            has_more = False
+            for license in queryset[:limit + 1].iterator(chunk_size=500):
+                if shown == limit:
+                    has_more = True
+                    break
+                
                 # Format status with color
-                status_str = license.status
-                if license.status == 'active':
-                    status_str = f"[green]{license.status}[/green]"
-                elif license.status == 'expired':
-                    status_str = f"[yellow]{license.status}[/yellow]"
-                elif license.status == 'revoked':
-                    status_str = f"[red]{license.status}[/red]"
+                color = STATUS_COLOR.get(license.status)
+                status_str = f"[{color}]{license.status}[/{color}]" if color else license.status
                 
                 # Add row
                 table.add_row(
@@ -108,14 +131,18 @@ class Command(BaseCommand):
                     status_str,
                     license.license_type.name,
                     license.user.username if license.user else "-",
-                    license.created_at.strftime('%Y-%m-%d') if license.created_at else "-",
-                    license.expires_at.strftime('%Y-%m-%d') if license.expires_at else "-"
+                    str(license.created_at.date()) if license.created_at else "-",
+                    str(license.expires_at.date()) if license.expires_at else "-"
                 )
+                shown += 1
+            
+            # Only count total matches when they don't all fit on the page
+            total_count = queryset.count() if has_more else shown
                 
             # Show results
-            console.print(f"\nFound {total_count} licenses" + (f" (showing {len(licenses)})" if total_count > limit else ""))
+            console.print(f"\nFound {total_count} licenses" + (f" (showing {shown})" if total_count > limit else ""))
             
-            if licenses:
+            if shown:
                 console.print(table)
             else:
                 console.print("[yellow]No licenses found matching the criteria.[/yellow]")
@@ -1,8 +1,8 @@
 # File: licenses/management/commands/revoke_key.py
 from django.core.management.base import BaseCommand, CommandError
-from rich.console import Console
 from rich.prompt import Confirm
 from licenses.services import LicenseService
+from licenses.management._rich import CONSOLE
 
 
 class Command(BaseCommand):
@@ -26,30 +26,29 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
-        console = Console()
+        console = CONSOLE
         
         try:
             key = options['key']
             reason = options.get('reason')
             force = options.get('force', False)
             
-            # Get license info first
-            info = LicenseService.get_license_info(key)
-            
-            if not info['success']:
-                console.print(f"[bold red]Error:[/bold red] {info['message']}")
-                return
-                
-            license_data = info['license_data']
-            
-            # Show license info
-            console.print(f"License: [bold cyan]{key}[/bold cyan]")
-            console.print(f"Status: {license_data['status']}")
-            console.print(f"Type: {license_data['license_type']}")
-            console.print(f"User: {license_data['user'] or 'Not assigned'}")
-            
-            # Skip confirmation if forced
+            # Show the license and ask for confirmation unless forced; revoke_license
+            # reports missing or already revoked keys on its own
             if not force:
+                info = LicenseService.get_license_info(key)
+                
+                if not info['success']:
+                    console.print(f"[bold red]Error:[/bold red] {info['message']}")
+                    return
+                    
+                license_data = info['license_data']
+                
+                console.print(f"License: [bold cyan]{key}[/bold cyan]")
+                console.print(f"Status: {license_data['status']}")
+                console.print(f"Type: {license_data['license_type']}")
+                console.print(f"User: {license_data['user'] or 'Not assigned'}")
+                
                 confirmed = Confirm.ask("\nAre you sure you want to revoke this license? This action cannot be undone.")
                 if not confirmed:
                     console.print("[yellow]Operation cancelled.[/yellow]")
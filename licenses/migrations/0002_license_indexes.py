@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-15 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('licenses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='license',
+            index=models.Index(fields=['status', '-created_at'], name='license_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='license',
+            index=models.Index(fields=['expires_at'], name='license_expires_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='license',
+            index=models.Index(fields=['license_type', '-created_at'], name='license_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='license',
+            index=models.Index(fields=['user', '-created_at'], name='license_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='licensecheck',
+            index=models.Index(fields=['license', '-timestamp'], name='check_license_time_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-15 10:04
+
+from django.db import migrations
+
+
+# Django compiles icontains on PostgreSQL to UPPER(column::text) LIKE UPPER(%s),
+# so the trigram indexes are built on that expression to be usable for searches.
+TRGM_INDEXES = {
+    'license_key_trgm_idx': 'key',
+    'license_notes_trgm_idx': 'notes',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in TRGM_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON licenses_license '
+            f'USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for name in TRGM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('licenses', '0002_license_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
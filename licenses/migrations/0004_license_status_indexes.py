@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-15 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('licenses', '0003_license_search_trgm'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='license',
+            index=models.Index(fields=['status', 'expires_at'], name='license_status_expires_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='license',
+            index=models.Index(fields=['user', 'status'], name='license_user_status_idx'),
+        ),
+    ]
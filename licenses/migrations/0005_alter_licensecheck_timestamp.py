@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-15 11:02
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('licenses', '0004_license_status_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='licensecheck',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
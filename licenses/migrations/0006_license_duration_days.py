@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-15 11:47
+
+from django.db import migrations, models
+
+
+def copy_duration_days(apps, schema_editor):
+    License = apps.get_model('licenses', 'License')
+    LicenseType = apps.get_model('licenses', 'LicenseType')
+    License.objects.update(
+        duration_days=models.Subquery(
+            LicenseType.objects.filter(pk=models.OuterRef('license_type_id')).values('duration_days')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('licenses', '0005_alter_licensecheck_timestamp'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='license',
+            name='duration_days',
+            field=models.IntegerField(default=365, editable=False),
+        ),
+        migrations.RunPython(copy_duration_days, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,19 @@
 # File: licenses/models.py
-from django.db import models
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, models, transaction
 from django.contrib.auth.models import User
 from django.utils import timezone
+import atexit
+import collections
+import hmac
+import logging
+import threading
 import uuid
 
 
+logger = logging.getLogger(__name__)
+
+
 class LicenseType(models.Model):
     """License type model defining different product tiers"""
     name = models.CharField(max_length=50)
@@ -19,6 +28,77 @@ class LicenseType(models.Model):
         return self.name
 
 
+class LicenseQuerySet(models.QuerySet):
+    """QuerySet with bulk status changes that mirror the License methods"""
+
+    def _lock_ids(self, guard):
+        """
+        Lock the licenses in this queryset that match guard and return their IDs.
+        Must run inside a transaction; the locks keep the status from changing
+        before the caller's UPDATE, so its audit rows match the rows it changed.
+        """
+        return list(self.model.objects.select_for_update().filter(
+            guard, id__in=self.values('id')
+        ).values_list('id', flat=True))
+
+    @transaction.atomic
+    def bulk_activate(self):
+        """Activate every license that isn't active or revoked"""
+        now = timezone.now()
+        guard = ~models.Q(status__in=['active', 'revoked'])
+        ids = self._lock_ids(guard)
+        licenses = self.model.objects.filter(guard, id__in=ids)
+
+        # Expiry depends on the license type, so issue one UPDATE per duration
+        activated = 0
+        durations = licenses.values_list('duration_days', flat=True).order_by().distinct()
+        for duration_days in list(durations):
+            activated += licenses.filter(duration_days=duration_days).update(
+                status='active',
+                activation_date=now,
+                expires_at=now + timezone.timedelta(days=duration_days),
+                updated_at=now
+            )
+
+        LicenseCheck.objects.bulk_create(
+            [LicenseCheck(license_id=license_id, status='activated') for license_id in ids],
+            batch_size=1000
+        )
+        return activated
+
+    @transaction.atomic
+    def bulk_deactivate(self):
+        """Deactivate every active license"""
+        guard = models.Q(status='active')
+        ids = self._lock_ids(guard)
+        deactivated = self.model.objects.filter(guard, id__in=ids).update(
+            status='pending',
+            updated_at=timezone.now()
+        )
+
+        LicenseCheck.objects.bulk_create(
+            [LicenseCheck(license_id=license_id, status='deactivated') for license_id in ids],
+            batch_size=1000
+        )
+        return deactivated
+
+    @transaction.atomic
+    def bulk_revoke(self, reason=None):
+        """Revoke every license that isn't already revoked"""
+        guard = ~models.Q(status='revoked')
+        ids = self._lock_ids(guard)
+        revoked = self.model.objects.filter(guard, id__in=ids).update(
+            status='revoked',
+            updated_at=timezone.now()
+        )
+
+        LicenseCheck.objects.bulk_create(
+            [LicenseCheck(license_id=license_id, status='revoked', message=reason) for license_id in ids],
+            batch_size=1000
+        )
+        return revoked
+
+
 class License(models.Model):
     """License model to store license key information"""
     STATUS_CHOICES = (
@@ -40,109 +120,145 @@ class License(models.Model):
     hardware_id = models.CharField(max_length=255, null=True, blank=True)
     max_activations = models.IntegerField(default=1)
     notes = models.TextField(blank=True, null=True)
+    # Copy of license_type.duration_days so expiry math doesn't need the license type
+    duration_days = models.IntegerField(default=365, editable=False)
+
+    objects = LicenseQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', '-created_at'], name='license_status_created_idx'),
+            models.Index(fields=['expires_at'], name='license_expires_idx'),
+            models.Index(fields=['license_type', '-created_at'], name='license_type_created_idx'),
+            models.Index(fields=['user', '-created_at'], name='license_user_created_idx'),
+            models.Index(fields=['status', 'expires_at'], name='license_status_expires_idx'),
+            models.Index(fields=['user', 'status'], name='license_user_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.key[:8]}... ({self.status})"
 
+    @classmethod
+    def _compute_expiry(cls, duration_days, activation_date=None):
+        """Expiration date for a license lasting duration_days activated at activation_date (default: now)"""
+        return (activation_date or timezone.now()) + timezone.timedelta(days=duration_days)
+
     def save(self, *args, **kwargs):
+        now = timezone.now()
+        
+        # Copy the duration when the license type is assigned or already loaded. Partial
+        # saves skip this, since update_fields wouldn't persist it; edits to a license
+        # type are copied onto its licenses by a post_save receiver in services
+        if self.license_type_id and kwargs.get('update_fields') is None and (
+            self._state.adding or License.license_type.is_cached(self)
+        ):
+            self.duration_days = self.license_type.duration_days
+        
         # Set expiration date based on license type if not set manually
-        if not self.expires_at and self.license_type:
-            if self.activation_date:
-                self.expires_at = self.activation_date + timezone.timedelta(days=self.license_type.duration_days)
-            else:
-                self.expires_at = timezone.now() + timezone.timedelta(days=self.license_type.duration_days)
+        if not self.expires_at and self.license_type_id:
+            self.expires_at = self._compute_expiry(self.duration_days, self.activation_date or now)
         
         # Check if expired
-        if self.expires_at and self.expires_at < timezone.now() and self.status != 'revoked':
+        if self.expires_at and self.expires_at < now and self.status != 'revoked':
             self.status = 'expired'
         
         super().save(*args, **kwargs)
 
+    @transaction.atomic
     def activate(self, hardware_id=None):
         """Activate the license"""
         if self.status != 'revoked':
+            now = timezone.now()
             self.status = 'active'
-            self.activation_date = timezone.now()
-            self.expires_at = self.activation_date + timezone.timedelta(days=self.license_type.duration_days)
+            self.activation_date = now
+            self.expires_at = self._compute_expiry(self.duration_days, now)
             
             if hardware_id:
                 self.hardware_id = hardware_id
                 
-            self.save()
-            LicenseCheck.objects.create(
+            self.save(update_fields=['status', 'activation_date', 'expires_at', 'hardware_id', 'updated_at'])
+            record_license_check(
                 license=self,
                 status='activated',
-                hardware_id=hardware_id
+                hardware_id=hardware_id,
+                timestamp=now
             )
             return True
         return False
 
+    @transaction.atomic
     def deactivate(self):
         """Deactivate the license"""
         if self.status == 'active':
             self.status = 'pending'
-            self.save()
-            LicenseCheck.objects.create(
+            self.save(update_fields=['status', 'updated_at'])
+            record_license_check(
                 license=self,
                 status='deactivated'
             )
             return True
         return False
 
+    @transaction.atomic
     def revoke(self):
         """Revoke the license permanently"""
         self.status = 'revoked'
-        self.save()
-        LicenseCheck.objects.create(
+        self.save(update_fields=['status', 'updated_at'])
+        record_license_check(
             license=self,
             status='revoked'
         )
         return True
 
+    @transaction.atomic
     def validate_license(self, hardware_id=None):
         """Check license validity and record the check"""
-        self.last_checked = timezone.now()
+        now = timezone.now()
+        self.last_checked = now
         
-        if self.expires_at and self.expires_at < timezone.now():
+        if self.expires_at and self.expires_at < now:
             self.status = 'expired'
-            self.save()
+            self.save(update_fields=['status', 'last_checked', 'updated_at'])
             
-            LicenseCheck.objects.create(
+            record_license_check(
                 license=self, 
                 status='check_failed',
                 message='License expired',
-                hardware_id=hardware_id
+                hardware_id=hardware_id,
+                timestamp=now
             )
             return False
             
         if self.status != 'active':
-            LicenseCheck.objects.create(
+            record_license_check(
                 license=self, 
                 status='check_failed',
                 message=f'License not active, status: {self.status}',
-                hardware_id=hardware_id
+                hardware_id=hardware_id,
+                timestamp=now
             )
             return False
             
         # Verify hardware ID if needed
-        if hardware_id and self.hardware_id and hardware_id != self.hardware_id:
-            LicenseCheck.objects.create(
+        if hardware_id and self.hardware_id and not hmac.compare_digest(hardware_id.encode(), self.hardware_id.encode()):
+            record_license_check(
                 license=self, 
                 status='check_failed',
                 message='Hardware ID mismatch',
-                hardware_id=hardware_id
+                hardware_id=hardware_id,
+                timestamp=now
             )
             return False
             
-        self.save()
+        # Only the check timestamp changes on a successful validation
+        self.save(update_fields=['last_checked'])
         
-        LicenseCheck.objects.create(
+        record_license_check(
             license=self,
             status='check_success',
-            hardware_id=hardware_id
+            hardware_id=hardware_id,
+            timestamp=now
         )
         return True
 
@@ -158,7 +274,7 @@ class LicenseCheck(models.Model):
     )
     
     license = models.ForeignKey(License, on_delete=models.CASCADE, related_name='checks')
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)
     status = models.CharField(max_length=20, choices=LICENSE_CHECK_STATUSES)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     hardware_id = models.CharField(max_length=255, null=True, blank=True)
@@ -167,6 +283,196 @@ class LicenseCheck(models.Model):
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['license', '-timestamp'], name='check_license_time_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.license.key[:8]}... - {self.status} at {self.timestamp}"
\ No newline at end of file
+        return f"{self.license.key[:8]}... - {self.status} at {self.timestamp}"
+
+
+# License checks recorded by the License methods are buffered and written in
+# batches, since validation runs on every client heartbeat. Rows still in the
+# buffer are flushed every LICENSE_CHECK_FLUSH_INTERVAL seconds, as soon as
+# LICENSE_CHECK_BATCH_SIZE rows are queued, and when the process exits.
+# Writes happen on the flusher thread, never in the request that queued the row.
+CHECK_BATCH_SIZE = getattr(settings, 'LICENSE_CHECK_BATCH_SIZE', 500)
+CHECK_FLUSH_INTERVAL = getattr(settings, 'LICENSE_CHECK_FLUSH_INTERVAL', 5)
+
+# Rows from failed writes are kept for the next flush, up to this many in total
+CHECK_BUFFER_LIMIT = CHECK_BATCH_SIZE * 20
+
+# Identical validation results for the same license and hardware ID within
+# LICENSE_CHECK_DEDUP_SECONDS are only recorded once, so clients that retry
+# aggressively don't multiply the audit rows
+CHECK_DEDUP_SECONDS = getattr(settings, 'LICENSE_CHECK_DEDUP_SECONDS', 5)
+DEDUPED_CHECK_STATUSES = ('check_success', 'check_failed')
+
+_check_buffer = []
+_check_buffer_lock = threading.Lock()
+_check_flusher = None
+_flush_requested = threading.Event()
+# Last time each check signature was recorded, oldest first
+_last_checks = collections.OrderedDict()
+
+
+def record_license_check(**fields):
+    """
+    Queue a LicenseCheck to be written with the next batched insert.
+    Pass license_key instead of license or license_id to have the ID looked
+    up when the batch is written rather than by the caller.
+    """
+    # bulk_create() doesn't run auto_now_add, so capture the event time now
+    fields.setdefault('timestamp', timezone.now())
+    # Keep only the ID; a buffered row must not hold on to the License instance
+    if 'license' in fields:
+        fields['license_id'] = fields.pop('license').pk
+    license_key = fields.pop('license_key', None)
+    check = LicenseCheck(**fields)
+    check.license_key = license_key
+    # Don't queue checks made inside a transaction that is later rolled back;
+    # robust=True keeps an audit failure from failing the caller
+    transaction.on_commit(lambda: _queue_check(check), robust=True)
+
+
+def _queue_check(check):
+    global _check_flusher
+
+    with _check_buffer_lock:
+        if _is_duplicate_check(check):
+            return
+        
+        _check_buffer.append(check)
+        buffer_full = len(_check_buffer) >= CHECK_BATCH_SIZE
+
+        if _check_flusher is None:
+            _check_flusher = threading.Thread(target=_flush_periodically, name='license-check-flusher', daemon=True)
+            _check_flusher.start()
+
+    # Wake the flusher rather than writing the batch in the caller's request
+    if buffer_full:
+        _flush_requested.set()
+
+
+def _is_duplicate_check(check):
+    """Whether an identical validation check was recorded within the dedup window; caller holds the lock"""
+    if check.status not in DEDUPED_CHECK_STATUSES or not CHECK_DEDUP_SECONDS:
+        return False
+    
+    window = timezone.timedelta(seconds=CHECK_DEDUP_SECONDS)
+    
+    # Forget entries that left the window; they are popped from the oldest end,
+    # so each check only touches the entries that actually expire
+    while _last_checks:
+        oldest_signature, oldest_timestamp = next(iter(_last_checks.items()))
+        if check.timestamp - oldest_timestamp < window:
+            break
+        _last_checks.popitem(last=False)
+    
+    signature = (check.license_id, check.status, check.hardware_id, check.message)
+    last_timestamp = _last_checks.get(signature)
+    if last_timestamp is not None and check.timestamp - last_timestamp < window:
+        return True
+    
+    _last_checks[signature] = check.timestamp
+    _last_checks.move_to_end(signature)
+    return False
+
+
+def flush_license_checks():
+    """
+    Write all buffered LicenseCheck rows, returning how many were written.
+    If the write fails, the rows go back in the buffer and the error is raised.
+    """
+    with _check_buffer_lock:
+        checks = _check_buffer[:]
+        _check_buffer.clear()
+
+    if not checks:
+        return 0
+
+    try:
+        return _write_checks(checks)
+    except Exception:
+        _requeue_checks(checks)
+        raise
+
+
+def _write_checks(checks):
+    checks = _resolve_license_keys(checks)
+    if not checks:
+        return 0
+
+    try:
+        _insert_checks(checks)
+        return len(checks)
+    except IntegrityError:
+        # A license deleted after its check was queued fails the whole batch, so
+        # drop only the checks of licenses that no longer exist and write the rest
+        license_ids = {check.license_id for check in checks}
+        existing_ids = set(License.objects.filter(id__in=license_ids).values_list('id', flat=True))
+        kept = [check for check in checks if check.license_id in existing_ids]
+
+        if len(kept) == len(checks):
+            # Not caused by a deleted license, so retrying the rows won't help
+            logger.exception('Dropped %d license checks that could not be written', len(checks))
+            return 0
+
+    logger.warning(
+        'Dropped %d license checks for deleted licenses %s',
+        len(checks) - len(kept), sorted(license_ids - existing_ids)
+    )
+    if kept:
+        _insert_checks(kept)
+    return len(kept)
+
+
+def _resolve_license_keys(checks):
+    """Fill in license_id for checks recorded by license key with one query, dropping deleted licenses"""
+    keys = {check.license_key for check in checks if check.license_id is None}
+    if not keys:
+        return checks
+
+    license_ids = dict(License.objects.filter(key__in=keys).values_list('key', 'id'))
+    for check in checks:
+        if check.license_id is None:
+            check.license_id = license_ids.get(check.license_key)
+
+    if len(license_ids) < len(keys):
+        logger.warning('Dropped license checks for deleted licenses %s', sorted(keys - license_ids.keys()))
+    return [check for check in checks if check.license_id is not None]
+
+
+def _insert_checks(checks):
+    # Clear IDs assigned by an earlier attempt that was rolled back
+    for check in checks:
+        check.pk = None
+
+    # All or nothing, so a failed batch can be retried without duplicates
+    with transaction.atomic():
+        LicenseCheck.objects.bulk_create(checks, batch_size=CHECK_BATCH_SIZE)
+
+
+def _requeue_checks(checks):
+    with _check_buffer_lock:
+        _check_buffer[:0] = checks
+        overflow = len(_check_buffer) - CHECK_BUFFER_LIMIT
+        if overflow > 0:
+            del _check_buffer[:overflow]
+            logger.error('License check buffer is full; dropped the %d oldest checks', overflow)
+
+
+def _flush_periodically():
+    while True:
+        _flush_requested.wait(CHECK_FLUSH_INTERVAL)
+        _flush_requested.clear()
+        try:
+            flush_license_checks()
+        except Exception:
+            # Keep the flusher alive; the rows are back in the buffer for the next flush
+            logger.exception('Failed to write buffered license checks')
+        finally:
+            close_old_connections()
+
+
+atexit.register(flush_license_checks)
@@ -1,26 +1,71 @@
 # File: licenses/services.py
+from django.core.cache import cache
 from django.utils import timezone
 from datetime import timedelta
-from .models import License, LicenseType, LicenseCheck
+from .models import License, LicenseType, LicenseCheck, record_license_check
 from .utils import generate_license_key, validate_license_key_format
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Prefetch, Q, TextField, Value
+from django.db.models.functions import Coalesce, Concat
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+# Fields returned by get_license_info() and get_license_with_history()
+LICENSE_INFO_FIELDS = (
+    'key', 'status', 'created_at', 'activation_date', 'expires_at', 'last_checked',
+    'license_type__name', 'max_activations', 'user__username', 'hardware_id', 'notes'
+)
+
+
+# Seconds a cached LicenseType stays valid. Saves and deletes clear the entry;
+# with the default per-process cache, other processes see the change only
+# once their entry times out
+LICENSE_TYPE_CACHE_TIMEOUT = 3600
+
+
+def _license_type_cache_key(license_type_id):
+    return f'licenses:license_type:{license_type_id}'
+
+
+def _get_license_type(license_type_id):
+    """
+    Fetch a license type by ID through the cache, since types rarely change.
+    Each call returns its own instance, unpickled from the cache.
+    """
+    return cache.get_or_set(
+        _license_type_cache_key(license_type_id),
+        lambda: LicenseType.objects.get(id=license_type_id),
+        LICENSE_TYPE_CACHE_TIMEOUT
+    )
+
+
+@receiver([post_save, post_delete], sender=LicenseType)
+def _clear_license_type_cache(sender, instance, **kwargs):
+    cache.delete(_license_type_cache_key(instance.pk))
+
+
+@receiver(post_save, sender=LicenseType)
+def _sync_license_durations(sender, instance, created, **kwargs):
+    # Licenses keep a copy of their type's duration for expiry math
+    if not created:
+        License.objects.filter(license_type=instance).exclude(
+            duration_days=instance.duration_days
+        ).update(duration_days=instance.duration_days)
 
 
 class LicenseService:
     """Service class for license-related operations"""
     
     @staticmethod
-    def create_license(license_type_id, user=None, prefix=None, max_activations=1, notes=None):
-        """Create a new license key"""
+    def create_license(license_type_id=None, user=None, prefix=None, max_activations=1, notes=None, license_type=None):
+        """Create a new license key from a license type instance or ID"""
         try:
-            license_type = LicenseType.objects.get(id=license_type_id)
+            if license_type is None:
+                license_type = _get_license_type(license_type_id)
             
             # Generate a unique license key
-            key = generate_license_key(
-                prefix=prefix, 
-                user_id=user.id if user else None,
-                license_type_id=license_type_id
-            )
+            key = generate_license_key(prefix=prefix)
             
             # Create the license
             license = License.objects.create(
@@ -28,7 +73,8 @@ class LicenseService:
                 user=user,
                 license_type=license_type,
                 max_activations=max_activations,
-                notes=notes
+                notes=notes,
+                duration_days=license_type.duration_days
             )
             
             return license
@@ -36,7 +82,51 @@ class LicenseService:
             raise ValueError(f"License type with ID {license_type_id} does not exist")
         except Exception as e:
             raise Exception(f"Failed to create license: {str(e)}")
-    
+
+    @staticmethod
+    def bulk_create_licenses(count, license_type_id=None, user=None, prefix=None, max_activations=1, notes=None,
+                             license_type=None):
+        """Create several license keys with batched INSERTs from a license type instance or ID"""
+        try:
+            if license_type is None:
+                license_type = _get_license_type(license_type_id)
+
+            # Over-generate candidate keys so a single query per round usually
+            # leaves enough non-colliding keys to fill the batch
+            keys = []
+            while len(keys) < count:
+                needed = count - len(keys)
+                candidates = [generate_license_key(prefix=prefix) for _ in range(int(needed * 1.05) + 5)]
+                taken = set(License.objects.filter(key__in=candidates).values_list('key', flat=True))
+                taken.update(keys)
+                for key in candidates:
+                    if key not in taken:
+                        taken.add(key)
+                        keys.append(key)
+                        if len(keys) == count:
+                            break
+
+            # bulk_create bypasses License.save(), so set the expiration here
+            expires_at = License._compute_expiry(license_type.duration_days)
+            licenses = [
+                License(
+                    key=key,
+                    user=user,
+                    license_type=license_type,
+                    max_activations=max_activations,
+                    notes=notes,
+                    expires_at=expires_at,
+                    duration_days=license_type.duration_days
+                )
+                for key in keys
+            ]
+
+            return License.objects.bulk_create(licenses, batch_size=1000)
+        except LicenseType.DoesNotExist:
+            raise ValueError(f"License type with ID {license_type_id} does not exist")
+        except Exception as e:
+            raise Exception(f"Failed to create licenses: {str(e)}")
+
     @staticmethod
     def validate_license(key, hardware_id=None):
         """Validate a license key and return validation status"""
@@ -47,25 +137,29 @@ class LicenseService:
             }
             
         try:
-            license = License.objects.get(key=key)
+            with transaction.atomic():
+                # Lock the row so concurrent validations of the same key are serialized
+                license = License.objects.select_for_update(of=('self',)).select_related(
+                    'license_type', 'user'
+                ).get(key=key)
             
-            # Record the check attempt
-            check_result = license.validate_license(hardware_id=hardware_id)
+                # Record the check attempt
+                check_result = license.validate_license(hardware_id=hardware_id)
             
-            if not check_result:
+                if not check_result:
+                    return {
+                        'valid': False,
+                        'message': f'License check failed: {license.status}',
+                        'status': license.status
+                    }
+                
                 return {
-                    'valid': False,
-                    'message': f'License check failed: {license.status}',
+                    'valid': True,
+                    'message': 'License is valid',
+                    'license_type': license.license_type.name,
+                    'expires_at': license.expires_at,
                     'status': license.status
                 }
-                
-            return {
-                'valid': True,
-                'message': 'License is valid',
-                'license_type': license.license_type.name,
-                'expires_at': license.expires_at,
-                'status': license.status
-            }
         except License.DoesNotExist:
             return {
                 'valid': False,
@@ -81,44 +175,48 @@ class LicenseService:
     def activate_license(key, hardware_id=None):
         """Activate a license"""
         try:
-            license = License.objects.get(key=key)
+            with transaction.atomic():
+                # Lock the row so concurrent activations can't both pass the status checks
+                license = License.objects.select_for_update(of=('self',)).select_related(
+                    'license_type', 'user'
+                ).get(key=key)
             
-            if license.status == 'active':
-                return {
-                    'success': False,
-                    'message': 'License is already active'
-                }
+                if license.status == 'active':
+                    return {
+                        'success': False,
+                        'message': 'License is already active'
+                    }
                 
-            if license.status == 'revoked':
-                return {
-                    'success': False,
-                    'message': 'License has been revoked and cannot be activated'
-                }
+                if license.status == 'revoked':
+                    return {
+                        'success': False,
+                        'message': 'License has been revoked and cannot be activated'
+                    }
                 
-            if license.status == 'expired':
-                return {
-                    'success': False,
-                    'message': 'License has expired and cannot be activated'
-                }
+                if license.status == 'expired':
+                    return {
+                        'success': False,
+                        'message': 'License has expired and cannot be activated'
+                    }
             
-            activation_result = license.activate(hardware_id)
+                activation_result = license.activate(hardware_id)
             
-            if not activation_result:
-                return {
-                    'success': False,
-                    'message': 'Failed to activate license'
-                }
+                if not activation_result:
+                    return {
+                        'success': False,
+                        'message': 'Failed to activate license'
+                    }
                 
-            return {
-                'success': True,
-                'message': 'License activated successfully',
-                'license_data': {
-                    'key': license.key,
-                    'status': license.status,
-                    'expires_at': license.expires_at,
-                    'license_type': license.license_type.name
+                return {
+                    'success': True,
+                    'message': 'License activated successfully',
+                    'license_data': {
+                        'key': license.key,
+                        'status': license.status,
+                        'expires_at': license.expires_at,
+                        'license_type': license.license_type.name
+                    }
                 }
-            }
         except License.DoesNotExist:
             return {
                 'success': False,
@@ -134,7 +232,7 @@ class LicenseService:
     def deactivate_license(key):
         """Deactivate a license"""
         try:
-            license = License.objects.get(key=key)
+            license = License.objects.select_related('license_type', 'user').get(key=key)
             
             if license.status != 'active':
                 return {
@@ -169,24 +267,71 @@ class LicenseService:
     def revoke_license(key, reason=None):
         """Revoke a license permanently"""
         try:
-            license = License.objects.get(key=key)
+            # Revoke and append the reason to the notes in a single UPDATE
+            changes = {'status': 'revoked', 'updated_at': timezone.now()}
+            if reason:
+                changes['notes'] = Concat(
+                    Coalesce('notes', Value(''), output_field=TextField()),
+                    Value(f"\nRevoked: {reason}"),
+                    output_field=TextField()
+                )
+            
+            revoked = License.objects.filter(key=key).exclude(status='revoked').update(**changes)
             
-            if license.status == 'revoked':
+            if not revoked:
+                # Only look the license up to explain why nothing was revoked
+                if License.objects.filter(key=key).exists():
+                    return {
+                        'success': False,
+                        'message': 'License is already revoked'
+                    }
                 return {
                     'success': False,
-                    'message': 'License is already revoked'
+                    'message': 'License key does not exist'
                 }
             
-            license.revoke()
-            
-            if reason:
-                license.notes = f"{license.notes or ''}\nRevoked: {reason}"
-                license.save()
+            # The license ID is looked up when the buffered check is written
+            record_license_check(license_key=key, status='revoked', message=reason)
                 
             return {
                 'success': True,
                 'message': 'License revoked successfully'
             }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Error revoking license: {str(e)}'
+            }
+    
+    @staticmethod
+    def _license_data(license):
+        """Serialize the LICENSE_INFO_FIELDS of a license"""
+        return {
+            'key': license.key,
+            'status': license.status,
+            'created_at': license.created_at,
+            'activation_date': license.activation_date,
+            'expires_at': license.expires_at,
+            'last_checked': license.last_checked,
+            'license_type': license.license_type.name,
+            'max_activations': license.max_activations,
+            'user': license.user.username if license.user else None,
+            'hardware_id': license.hardware_id,
+            'notes': license.notes
+        }
+    
+    @staticmethod
+    def get_license_info(key):
+        """Get detailed information about a license"""
+        try:
+            license = License.objects.select_related('license_type', 'user').only(
+                *LICENSE_INFO_FIELDS
+            ).get(key=key)
+            
+            return {
+                'success': True,
+                'license_data': LicenseService._license_data(license)
+            }
         except License.DoesNotExist:
             return {
                 'success': False,
@@ -195,30 +340,38 @@ class LicenseService:
         except Exception as e:
             return {
                 'success': False,
-                'message': f'Error revoking license: {str(e)}'
+                'message': f'Error retrieving license info: {str(e)}'
             }
     
     @staticmethod
-    def get_license_info(key):
-        """Get detailed information about a license"""
+    def get_license_with_history(key, limit=20):
+        """Get detailed information about a license and its most recent checks"""
         try:
-            license = License.objects.get(key=key)
+            recent_checks = Prefetch(
+                'checks',
+                queryset=LicenseCheck.objects.only(
+                    'license', 'timestamp', 'status', 'message', 'hardware_id'
+                ).order_by('-timestamp')[:limit],
+                to_attr='recent_checks'
+            )
+            license = License.objects.select_related('license_type', 'user').only(
+                *LICENSE_INFO_FIELDS
+            ).prefetch_related(recent_checks).get(key=key)
+            
+            license_data = LicenseService._license_data(license)
+            license_data['recent_checks'] = [
+                {
+                    'timestamp': check.timestamp,
+                    'status': check.status,
+                    'message': check.message,
+                    'hardware_id': check.hardware_id
+                }
+                for check in license.recent_checks
+            ]
             
             return {
                 'success': True,
-                'license_data': {
-                    'key': license.key,
-                    'status': license.status,
-                    'created_at': license.created_at,
-                    'activation_date': license.activation_date,
-                    'expires_at': license.expires_at,
-                    'last_checked': license.last_checked,
-                    'license_type': license.license_type.name,
-                    'max_activations': license.max_activations,
-                    'user': license.user.username if license.user else None,
-                    'hardware_id': license.hardware_id,
-                    'notes': license.notes
-                }
+                'license_data': license_data
             }
         except License.DoesNotExist:
             return {
@@ -232,27 +385,56 @@ class LicenseService:
             }
     
     @staticmethod
-    def search_licenses(query=None, status=None, license_type=None, active_only=False, order_by='-created_at'):
-        """Search and filter licenses"""
-        filters = Q()
+    def sweep_expired():
+        """Mark every license past its expiration date as expired with a single UPDATE"""
+        now = timezone.now()
+        return License.objects.filter(expires_at__lt=now).exclude(
+            status__in=['expired', 'revoked']
+        ).update(status='expired', updated_at=now)
+    
+    @staticmethod
+    def search_licenses(query=None, status=None, license_type=None, active_only=False, order_by='-created_at',
+                        values=False, limit=None):
+        """
+        Search and filter licenses.
+        With values=True, return dicts of the listing fields instead of License objects.
+        
+        The result is a lazy QuerySet, but evaluating it loads every match into
+        memory; pass limit to cap the rows, or use search_licenses_iter() to stream them.
+        """
+        if values:
+            licenses = License.objects.values('key', 'status', 'license_type__name', 'expires_at')
+        else:
+            licenses = License.objects.select_related('license_type', 'user')
         
         if query:
-            filters |= Q(key__icontains=query) | Q(notes__icontains=query)
-            
-            # If the query could be a username
-            filters |= Q(user__username__icontains=query)
+            # Match the key, notes or a username
+            licenses = licenses.filter(
+                Q(key__icontains=query) | Q(notes__icontains=query) | Q(user__username__icontains=query)
+            )
             
         if status:
-            filters &= Q(status=status)
+            licenses = licenses.filter(status=status)
             
         if license_type:
-            filters &= Q(license_type__name=license_type)
+            licenses = licenses.filter(license_type__name=license_type)
             
         if active_only:
-            filters &= Q(status='active')
+            licenses = licenses.filter(status='active')
             
         try:
-            licenses = License.objects.filter(filters).order_by(order_by)
+            licenses = licenses.order_by(order_by)
+            
+            if limit is not None:
+                licenses = licenses[:limit]
             return licenses
         except Exception as e:
-            raise Exception(f"Error searching licenses: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error searching licenses: {str(e)}")
+    
+    @staticmethod
+    def search_licenses_iter(chunk_size=1000, **kwargs):
+        """
+        Stream search_licenses() results, holding at most chunk_size rows in memory.
+        Uses a server-side cursor on PostgreSQL.
+        """
+        return LicenseService.search_licenses(**kwargs).iterator(chunk_size=chunk_size)
\ No newline at end of file
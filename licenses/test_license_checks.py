@@ -0,0 +1,71 @@
+# File: licenses/test_license_checks.py
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import TransactionTestCase
+
+from . import models
+from .models import License, LicenseCheck, LicenseType, flush_license_checks, record_license_check
+from .services import LicenseService
+
+
+@mock.patch.object(models, '_check_flusher', mock.sentinel.flusher)
+class LicenseCheckBufferTests(TransactionTestCase):
+    """Buffered LicenseCheck writes; a TransactionTestCase so on_commit callbacks and FK checks run"""
+
+    def setUp(self):
+        models._check_buffer.clear()
+        models._last_checks.clear()
+        models._flush_requested.clear()
+        license_type = LicenseType.objects.create(name='Standard', description='Standard', duration_days=30)
+        self.license_a = License.objects.create(key='AAAAA-AAAAA-AAAAA-AAAAA-AAAAA', license_type=license_type)
+        self.license_b = License.objects.create(
+            key='BBBBB-BBBBB-BBBBB-BBBBB-BBBBB', license_type=license_type, status='active'
+        )
+
+    def test_full_buffer_wakes_flusher_without_writing(self):
+        with mock.patch.object(models, 'CHECK_BATCH_SIZE', 2):
+            record_license_check(license=self.license_a, status='activated')
+            record_license_check(license=self.license_b, status='activated')
+
+        self.assertTrue(models._flush_requested.is_set())
+        self.assertEqual(LicenseCheck.objects.count(), 0)
+        self.assertEqual(len(models._check_buffer), 2)
+
+    def test_validation_succeeds_after_queued_license_is_deleted(self):
+        with mock.patch.object(models, 'CHECK_BATCH_SIZE', 2):
+            record_license_check(license=self.license_a, status='activated')
+            License.objects.filter(id=self.license_a.id).delete()
+            result = LicenseService.validate_license(self.license_b.key)
+
+        self.assertTrue(result['valid'])
+        self.assertEqual(flush_license_checks(), 1)
+        self.assertEqual(
+            list(LicenseCheck.objects.values_list('license_id', 'status')),
+            [(self.license_b.id, 'check_success')]
+        )
+        self.assertEqual(models._check_buffer, [])
+
+    def test_failed_flush_keeps_checks_for_next_flush(self):
+        record_license_check(license=self.license_a, status='activated')
+
+        with mock.patch.object(LicenseCheck.objects, 'bulk_create', side_effect=OperationalError('database is locked')):
+            with self.assertRaises(OperationalError):
+                flush_license_checks()
+
+        self.assertEqual(len(models._check_buffer), 1)
+        self.assertEqual(flush_license_checks(), 1)
+        self.assertEqual(LicenseCheck.objects.get().license_id, self.license_a.id)
+
+    def test_revoke_records_check_by_license_key(self):
+        result = LicenseService.revoke_license(self.license_b.key, reason='Refunded')
+
+        self.assertTrue(result['success'])
+        self.assertEqual(flush_license_checks(), 1)
+        self.assertEqual(
+            list(LicenseCheck.objects.values_list('license_id', 'status', 'message')),
+            [(self.license_b.id, 'revoked', 'Refunded')]
+        )
+        self.assertEqual(
+            LicenseService.revoke_license(self.license_b.key)['message'], 'License is already revoked'
+        )
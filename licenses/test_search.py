@@ -0,0 +1,37 @@
+# File: licenses/test_search.py
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from .models import License, LicenseType
+from .services import LicenseService
+
+
+class SearchLicensesTests(TestCase):
+    """search_licenses() query matching"""
+
+    def setUp(self):
+        license_type = LicenseType.objects.create(name='Standard', description='Standard', duration_days=30)
+        self.user_license = License.objects.create(
+            key='CCCCC-CCCCC-CCCCC-CCCCC-CCCCC', license_type=license_type,
+            user=User.objects.create(username='johnsmithcompany2024x')
+        )
+        self.prefixed_license = License.objects.create(key='ACME-DDDDD-DDDDD-DDDDD-DDDDD-DDDDD', license_type=license_type)
+        self.noted_license = License.objects.create(
+            key='EEEEE-EEEEE-EEEEE-EEEEE-EEEEE', license_type=license_type,
+            notes='Replaces FFFFF-FFFFF-FFFFF-FFFFF-FFFFF'
+        )
+
+    def assertFinds(self, query, license):
+        self.assertEqual(list(LicenseService.search_licenses(query=query)), [license])
+
+    def test_username_query(self):
+        self.assertFinds('johnsmithcompany2024x', self.user_license)
+
+    def test_prefixed_key_body_query(self):
+        self.assertFinds('DDDDD-DDDDD-DDDDD-DDDDD-DDDDD', self.prefixed_license)
+
+    def test_whole_key_query(self):
+        self.assertFinds('acme-ddddd-ddddd-ddddd-ddddd-ddddd', self.prefixed_license)
+
+    def test_key_in_notes_query(self):
+        self.assertFinds('FFFFF-FFFFF-FFFFF-FFFFF-FFFFF', self.noted_license)
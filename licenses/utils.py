@@ -1,71 +1,88 @@
 # File: licenses/utils.py
 import os
-import uuid
+import functools
 import hashlib
 import hmac
-import random
+import secrets
 import string
 import base64
-from datetime import datetime, timedelta
-from django.conf import settings
+from pathlib import Path
 from django.utils import timezone
-import jwt
 
 
-def generate_license_key(prefix=None, secret=None, user_id=None, license_type_id=None):
+# Location of the cached hardware ID reused across CLI invocations
+HARDWARE_ID_CACHE = Path('~/.cache/eclipse/hwid').expanduser()
+
+# Characters allowed in a license key once dashes are removed
+_LICENSE_KEY_BYTES = (string.ascii_uppercase + string.digits).encode('ascii')
+
+
+def generate_license_key(prefix=None):
     """
     Generate a unique license key with the following format:
-    XXXXX-XXXXX-XXXXX-XXXXX-XXXXX
+    XXXXX-XXXXX-XXXXX-XXXXX-XXXXX (or PREFIX-XXXXX-... with a prefix)
     
-    The license key contains a verification mechanism via JWT.
+    The key is drawn from the OS CSPRNG and encoded as base32.
     """
-    if not secret:
-        secret = settings.LICENSE_SECRET
-    
-    # Generate a random string as the base for the license key
-    random_part = ''.join(random.choices(string.ascii_uppercase + string.digits, k=16))
-    
-    # Create a payload for encoding
-    current_time = datetime.utcnow()
-    payload = {
-        'jti': str(uuid.uuid4()),  # JWT ID
-        'iat': current_time,
-        'user_id': user_id,
-        'license_type': license_type_id,
-        'random': random_part,
-    }
-    
-    # Create the JWT token
-    jwt_token = jwt.encode(payload, secret, algorithm='HS256')
-    
-    # Convert the JWT to a shorter string
-    raw_key_bytes = hashlib.sha256(jwt_token.encode('utf-8')).digest()
-    key_b64 = base64.b32encode(raw_key_bytes).decode('utf-8')
-    
-    # Format the key with prefix and separators
-    key = key_b64[:25].upper()  # Use only first 25 chars to keep it manageable
-    if prefix:
-        key = f"{prefix}-{key}"
+    # 16 random bytes encode to 26 base32 characters; 25 are kept (125 bits)
+    key_b32 = base64.b32encode(secrets.token_bytes(16)).decode('ascii')
     
-    # Format with dashes every 5 characters
-    formatted_key = '-'.join([key[i:i+5] for i in range(0, len(key), 5)])
-    return formatted_key
+    # Format as five blocks of five characters, after the prefix if given
+    key = key_b32[:25]
+    formatted_key = f"{key[0:5]}-{key[5:10]}-{key[10:15]}-{key[15:20]}-{key[20:25]}"
+    return f"{prefix}-{formatted_key}" if prefix else formatted_key
 
 
 def validate_license_key_format(key):
     """Validate the format of a license key"""
     # Remove any dashes
     key_clean = key.replace('-', '').upper()
+    if not 20 <= len(key_clean) <= 30 or not key_clean.isascii():
+        return False
     
-    # Check for valid base32 characters (excluding padding)
-    valid_chars = set(string.ascii_uppercase + string.digits)
-    return all(c in valid_chars for c in key_clean) and 20 <= len(key_clean) <= 30
+    # Check for valid base32 characters (excluding padding): deleting every
+    # allowed byte must leave nothing behind
+    return not key_clean.encode('ascii').translate(None, _LICENSE_KEY_BYTES)
 
 
-def generate_hardware_id():
+def generate_hardware_id(refresh=False):
+    """
+    Return the hardware ID for this system, cached in HARDWARE_ID_CACHE.
+    Pass refresh=True to ignore the cached value and probe the system again.
+    """
+    if refresh:
+        # Forget the in-process result too, so the system is really probed again
+        _probe_hardware_id.cache_clear()
+    else:
+        try:
+            cached_id = HARDWARE_ID_CACHE.read_text().strip()
+            if cached_id:
+                return cached_id
+        except OSError:
+            pass
+
+    hardware_id = _probe_hardware_id()
+
+    # The cache is only an optimization, so failing to write it is not an error
+    try:
+        os.makedirs(HARDWARE_ID_CACHE.parent, exist_ok=True)
+        fd = os.open(HARDWARE_ID_CACHE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(hardware_id)
+    except OSError:
+        pass
+
+    return hardware_id
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_hardware_id():
     """
     Generate a pseudo hardware ID for testing purposes.
     In a real application, you would collect system-specific hardware information.
+    
+    The result is cached for the lifetime of the process; platform.processor()
+    can shell out to uname, and none of these values change while running.
     """
     # This is a simplified example - in a real app, collect actual hardware info
     import platform
@@ -87,4 +104,5 @@ def verify_hardware_id(stored_id, current_id):
     Verify that the hardware ID matches the one stored in the license.
     In a real app, you might want to allow for some differences.
     """
-    return stored_id == current_id
\ No newline at end of file
+    # Constant-time comparison; encode first since compare_digest only accepts ASCII str
+    return hmac.compare_digest((stored_id or '').encode(), (current_id or '').encode())
\ No newline at end of file
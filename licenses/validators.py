@@ -5,6 +5,11 @@ import re
 from .utils import validate_license_key_format
 
 
+# Compiled once at import; both are used with fullmatch()
+_HARDWARE_ID_RE = re.compile(r'[0-9a-fA-F]{64}')
+_LICENSE_PREFIX_RE = re.compile(r'[A-Z0-9]+')
+
+
 def validate_license_key(value):
     """
     Validate that a license key is properly formatted.
@@ -25,7 +30,7 @@ def validate_hardware_id(value):
         return
         
     # Check if it looks like a SHA-256 hash (64 hex characters)
-    if not re.match(r'^[0-9a-f]{64}$', value.lower()):
+    if not _HARDWARE_ID_RE.fullmatch(value):
         raise ValidationError(
             _('%(value)s is not a valid hardware ID. Expected a 64-character hexadecimal string.'),
             params={'value': value},
@@ -70,7 +75,7 @@ def validate_license_prefix(value):
     """
     Validate that a license prefix only contains letters and numbers.
     """
-    if value and not re.match(r'^[A-Z0-9]+$', value):
+    if value and not _LICENSE_PREFIX_RE.fullmatch(value):
         raise ValidationError(
             _('License prefix must contain only uppercase letters and numbers.'),
         )